@@ -1,51 +1,115 @@
 #!/usr/bin/env python3
 import argparse
+import shlex
+import shutil
+import stat
 import subprocess
 import sys
-import tarfile
-import tempfile
-from datetime import datetime
+import functools
 import os
+import time
+
+# git is resolved once so each exec skips the PATH search
+_GIT_PATH = shutil.which('git')
+GIT = _GIT_PATH or 'git'
+
+# Backup branches share almost all history with the local repository, so the
+# skipping negotiator finds common commits in far fewer round-trips
+FETCH_CONFIG = ['-c', 'fetch.negotiationAlgorithm=skipping']
+
+# Snapshot of the environment, taken once and merged with per-command overrides
+_BASE_ENV = os.environ.copy()
 
 # --- UTILITY FUNCTIONS ---
 
-def run_command(command, capture_output=False, check=True, env=None):
-    """Executes a shell command and handles errors."""
+def run_command(command, capture_output=False, check=True, env=None, quiet=False, stdout_discard=False, binary=False, input_data=None):
+    """Executes a shell command and handles errors. quiet=True discards all of its output,
+    stdout_discard=True only its stdout, keeping stderr for the error report.
+    binary=True returns captured output as undecoded bytes and takes input_data as bytes."""
+    # The UI swaps sys.stdout for a buffer that child processes can't see, so
+    # their output is collected and written through sys.stdout/sys.stderr instead
+    echo = not (capture_output or quiet or stdout_discard) and _output_redirected()
+
+    # If env is provided, merge it with the base environment
+    command_env = {**_BASE_ENV, **env} if env else None
+    if quiet:
+        stdout = stderr = subprocess.DEVNULL
+    elif stdout_discard:
+        stdout, stderr = subprocess.DEVNULL, subprocess.PIPE
+    else:
+        stdout = stderr = None
+    if echo:
+        stdout = stdout or subprocess.PIPE
+        stderr = subprocess.PIPE
+
     try:
-        # If env is provided, merge it with current environment
-        if env:
-            import os
-            command_env = os.environ.copy()
-            command_env.update(env)
-        else:
-            command_env = None
-            
         result = subprocess.run(
             command,
-            text=True,
+            input=input_data,
             capture_output=capture_output,
-            check=check,
-            encoding='utf-8',
-            env=command_env
+            stdout=stdout,
+            stderr=stderr,
+            encoding=None if binary else 'utf-8',
+            env=command_env,
+            # Python's own descriptors are non-inheritable, so there is nothing to
+            # close in the child; with an absolute GIT path and no preexec_fn this
+            # also lets CPython start git with posix_spawn instead of fork+exec
+            close_fds=False
         )
-        return result
     except FileNotFoundError:
         print(f"Error: Command '{command[0]}' not found. Is it in your PATH?", file=sys.stderr)
         sys.exit(1)
-    except subprocess.CalledProcessError as e:
+
+    # Failures are checked by return code so callers passing check=False can
+    # inspect expected non-zero exits without going through CalledProcessError
+    if check and result.returncode != 0:
         print(f"Error executing command: {' '.join(command)}", file=sys.stderr)
-        if e.stdout:
+        result_stdout, result_stderr = result.stdout, result.stderr
+        if binary:
+            # Only decode when there is an error to show
+            result_stdout = result_stdout and result_stdout.decode('utf-8', 'replace')
+            result_stderr = result_stderr and result_stderr.decode('utf-8', 'replace')
+        if result_stdout:
             print(f"""STDOUT:
-{e.stdout}""", file=sys.stderr)
-        if e.stderr:
+{result_stdout}""", file=sys.stderr)
+        if result_stderr:
             print(f"""STDERR:
-{e.stderr}""", file=sys.stderr)
+{result_stderr}""", file=sys.stderr)
         sys.exit(1)
+    if echo:
+        for data, stream in ((result.stdout, sys.stdout), (result.stderr, sys.stderr)):
+            if data:
+                stream.write(data.decode('utf-8', 'replace') if binary else data)
+    return result
+
+def _output_redirected():
+    """Returns True when sys.stdout has been swapped out, as the UI does to capture a command's output."""
+    return sys.stdout is not sys.__stdout__
 
+@functools.lru_cache(maxsize=1)
 def is_git_repository():
     """Checks if the current directory is a Git repository."""
-    result = subprocess.run(['git', 'rev-parse', '--is-inside-work-tree'], capture_output=True, text=True)
-    return result.stdout.strip() == 'true'
+    result = subprocess.run(
+        [GIT, 'rev-parse', '--is-inside-work-tree', '--absolute-git-dir', '--show-toplevel'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        close_fds=False
+    )
+    lines = result.stdout.splitlines()
+    if result.returncode != 0 or len(lines) != 3 or lines[0] != 'true':
+        return False
+    # Pass the locations found here to every later git call, so none of them
+    # has to search upwards for the repository again
+    repository_env = {'GIT_DIR': lines[1], 'GIT_WORK_TREE': lines[2]}
+    os.environ.update(repository_env)
+    _BASE_ENV.update(repository_env)
+    return True
+
+def _timestamp():
+    """Returns the current UTC time formatted for backup branch and archive names."""
+    # UTC keeps names unique and sortable across DST changes and time zones
+    return time.strftime('%Y-%m-%dT%H-%M-%SZ', time.gmtime())
 
 # --- GIT BACKUP LOGIC ---
 
@@ -53,81 +117,172 @@ def init_backup_repo(url, identity_file=None):
     """Sets the backup repository URL and optional SSH identity file in the local Git config."""
     if not is_git_repository():
         print("Error: Not a Git repository. Cannot initialize for backup.", file=sys.stderr)
-        return
-    run_command(['git', 'config', f'backup.url', url])
+        return 1
+    run_command([GIT, 'config', f'backup.url', url], stdout_discard=True)
     print(f"Backup repository URL set to: {url}")
     
     if identity_file:
-        run_command(['git', 'config', f'backup.identityFile', identity_file])
+        run_command([GIT, 'config', f'backup.identityFile', identity_file], stdout_discard=True)
         print(f"SSH identity file set to: {identity_file}")
 
+    # Drop cached config reads so later calls in this process see the new values
+    get_backup_config.cache_clear()
+    get_git_env.cache_clear()
+
+@functools.lru_cache(maxsize=1)
+def get_backup_config():
+    """Reads every backup.* key, and core.sshCommand, from the Git config with a single git call."""
+    if not is_git_repository():
+        return {}
+    result = run_command([GIT, 'config', '-z', '--get-regexp', r'^(backup\.|core\.sshcommand$)'], capture_output=True, check=False)
+    config = {}
+    # -z output is "key\nvalue\0" per entry; git reports keys lower-cased
+    for entry in result.stdout.split('\0'):
+        if entry:
+            key, _, value = entry.partition('\n')
+            config[key] = value
+    return config
+
 def get_backup_repo_url():
     """Retrieves the backup repository URL from the local Git config."""
-    if not is_git_repository():
-        return None
-    result = run_command(['git', 'config', '--get', f'backup.url'], capture_output=True, check=False)
-    return result.stdout.strip() or None
+    return get_backup_config().get('backup.url') or None
 
 def get_backup_identity_file():
     """Retrieves the SSH identity file path from the local Git config."""
-    if not is_git_repository():
-        return None
-    result = run_command(['git', 'config', '--get', f'backup.identityFile'], capture_output=True, check=False)
-    return result.stdout.strip() or None
+    return get_backup_config().get('backup.identityfile') or None
 
+@functools.lru_cache(maxsize=1)
 def get_git_env():
-    """Returns environment variables for Git commands with SSH identity if configured."""
+    """Returns environment variables for Git commands with SSH identity and connection sharing."""
+    # The user's own ssh setup, in the order git itself checks it
+    ssh_command = os.environ.get('GIT_SSH_COMMAND') or get_backup_config().get('core.sshcommand')
+    custom_ssh = bool(ssh_command or os.environ.get('GIT_SSH'))
     identity_file = get_backup_identity_file()
+    if custom_ssh and not identity_file:
+        # Leave a configured ssh command alone; it may not be OpenSSH at all
+        return {}
+    ssh_command = ssh_command or 'ssh'
+    control_dir = _ssh_control_dir() if not custom_ssh and os.name != 'nt' else None
+    if control_dir:
+        # Keep one multiplexed SSH connection alive so back-to-back remote calls
+        # (status, list, diff, restore) skip the handshake after the first one.
+        # %C is a short hash, which keeps the socket path under the length limit.
+        control_path = shlex.quote(os.path.join(control_dir, 'stash-away-%C'))
+        ssh_command += f' -o ControlMaster=auto -o ControlPath={control_path} -o ControlPersist=60s'
     if identity_file:
-        return {'GIT_SSH_COMMAND': f'ssh -i {identity_file} -o IdentitiesOnly=yes'}
-    return None
+        ssh_command += f' -i {identity_file} -o IdentitiesOnly=yes'
+    return {'GIT_SSH_COMMAND': ssh_command}
+
+def _ssh_control_dir():
+    """Returns a private directory for the SSH connection-sharing socket, or None."""
+    # ssh treats a socket it cannot bind as fatal, so the directory must exist
+    ssh_dir = os.path.expanduser('~/.ssh')
+    if os.path.isdir(ssh_dir):
+        return ssh_dir
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return runtime_dir
+    import tempfile
+    control_dir = os.path.join(tempfile.gettempdir(), f'stash-away-ssh-{os.getuid()}')
+    try:
+        os.mkdir(control_dir, 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return None
+    # The temp directory is shared; only use one that is ours and private
+    info = os.lstat(control_dir)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        return None
+    return control_dir
 
-def push_to_backup():
-    """Pushes all local changes to a new branch in the backup repository."""
+def _changed_paths():
+    """Returns the paths whose index or working tree state differs from HEAD, relative to the top level."""
+    # --no-renames keeps every -z entry a single "XY path" record
+    status = run_command(
+        [GIT, 'status', '--porcelain', '-z', '--untracked-files=all', '--no-renames'],
+        capture_output=True,
+        binary=True
+    ).stdout
+    # Untracked nested repositories are listed as "dir/"; without the slash
+    # update-index records them as gitlinks, like add -A does
+    return [entry[3:].rstrip(b'/') for entry in status.split(b'\0') if entry]
+
+def _snapshot_tree(index_path, top_level, changed_paths):
+    """Writes the working tree, including untracked files, to a tree object and returns its SHA."""
+    # Imported here so commands that never snapshot skip its import cost
+    import tempfile
+    # Build the snapshot in a throwaway index so the working tree, the real
+    # index and the current branch are never touched
+    with tempfile.TemporaryDirectory(prefix='stash-away-') as temp_dir:
+        temp_index = os.path.join(temp_dir, 'index')
+        index_env = {'GIT_INDEX_FILE': temp_index}
+        # A copy of the real index already holds anything staged, so only the
+        # paths git status reported need updating; the worktree is not walked again
+        if os.path.exists(index_path):
+            shutil.copyfile(index_path, temp_index)
+        if changed_paths:
+            # Status paths are relative to the top level, and so must update-index's be
+            run_command(
+                [GIT, '-C', top_level or '.', 'update-index', '--add', '--remove', '-z', '--stdin'],
+                env=index_env,
+                binary=True,
+                input_data=b''.join(path + b'\0' for path in changed_paths)
+            )
+        return run_command([GIT, 'write-tree'], capture_output=True, env=index_env).stdout.strip()
+
+def push_to_backup(exec_push=False):
+    """Pushes all local changes to a new branch in the backup repository.
+    exec_push=True replaces this process with the final git push."""
     if not is_git_repository():
         print("Error: Not a Git repository. Cannot proceed with backup.", file=sys.stderr)
-        return
+        return 1
 
     backup_url = get_backup_repo_url()
     if not backup_url:
         print("Error: Backup repository URL not set. Please run 'init' first.", file=sys.stderr)
-        return
+        return 1
     
-    # Check for uncommitted changes
-    status_result = run_command(['git', 'status', '--porcelain'], capture_output=True)
-    if not status_result.stdout.strip():
-        print("No changes to backup. Working directory is clean.")
-        return
-
     print("Starting backup to personal Git repository...")
 
-    current_branch = run_command(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], capture_output=True).stdout.strip()
+    # A single rev-parse answers all the questions the snapshot needs;
+    # --show-cdup is last because it prints an empty line at the top level
+    index_path, current_branch, top_level = run_command(
+        [GIT, 'rev-parse', '--git-path', 'index', '--abbrev-ref', 'HEAD', '--show-cdup'],
+        capture_output=True
+    ).stdout.splitlines()
     print(f"Current branch: {current_branch}")
 
-    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    timestamp = _timestamp()
     backup_branch = f'backup/{timestamp}'
-    print(f"Creating backup branch: {backup_branch}")
 
-    run_command(['git', 'stash', 'push', '-u', '-m', f'Backup-stash for {backup_branch}'])
-    print("Stashed uncommitted changes.")
-
-    run_command(['git', 'checkout', '-b', backup_branch])
-
-    run_command(['git', 'stash', 'pop'])
-    print("Applied stashed changes to the backup branch.")
+    # One status walk finds staged, unstaged and untracked changes; it is also
+    # the only walk, since the snapshot below reuses its path list
+    changed_paths = _changed_paths()
+    if not changed_paths:
+        print("No changes to backup. Working directory is clean.")
+        return
+    tree = _snapshot_tree(index_path, top_level, changed_paths)
 
-    run_command(['git', 'add', '.'])
-    run_command(['git', 'commit', '-m', f'Backup snapshot: {timestamp}'])
-    print("Committed all changes to the backup branch.")
+    print(f"Creating backup branch: {backup_branch}")
+    commit = run_command(
+        [GIT, 'commit-tree', tree, '-p', 'HEAD', '-m', f'Backup snapshot: {timestamp}'],
+        capture_output=True
+    ).stdout.strip()
+    print("Committed all changes to the backup snapshot.")
 
     print(f"Pushing to backup repository at {backup_url}...")
-    run_command(['git', 'push', backup_url, f'{backup_branch}:{backup_branch}'], env=get_git_env())
+    # Sparse reachability walks keep pack building cheap for a single new commit
+    push_command = [GIT, '-c', 'pack.useSparse=true', 'push', backup_url, f'{commit}:refs/heads/{backup_branch}']
+    if exec_push and os.name != 'nt':
+        # Nothing is left to clean up, so git can take over the process and
+        # report the outcome through its own output and exit status
+        print(f"Your changes will be stored in branch '{backup_branch}' in your personal repository.")
+        sys.stdout.flush()
+        os.execve(GIT, push_command, {**_BASE_ENV, **get_git_env()})
+    run_command(push_command, env=get_git_env())
     print("Push successful.")
 
-    print("Cleaning up...")
-    run_command(['git', 'checkout', current_branch])
-    run_command(['git', 'branch', '-D', backup_branch])
-    print(f"Returned to branch '{current_branch}' and deleted local backup branch.")
     print("Backup complete!")
     print(f"Your changes are safely stored in branch '{backup_branch}' in your personal repository.")
 
@@ -136,60 +291,75 @@ def list_backups():
     backup_url = get_backup_repo_url()
     if not backup_url:
         print("Error: Backup repository URL not set. Please run 'init' first.", file=sys.stderr)
-        return
+        return 1
 
     print(f"Fetching backups from {backup_url}...")
-    result = run_command(
-        ['git', 'ls-remote', '--heads', backup_url, 'refs/heads/backup/*'],
-        capture_output=True,
-        env=get_git_env()
-    )
-
-    branches = result.stdout.strip().split('\n')
-    if not any(branches):
+    command = [GIT, 'ls-remote', '--heads', backup_url, 'refs/heads/backup/*']
+    # Print each backup as git reports it instead of waiting for the full list
+    stderr = subprocess.PIPE if _output_redirected() else None
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, env={**_BASE_ENV, **get_git_env()}, close_fds=False)
+    found = False
+    for line in proc.stdout:
+        # Each line is "<sha>\trefs/heads/backup/..."
+        branch_name = line.split(b'\t', 1)[1].rstrip().removeprefix(b'refs/heads/')
+        if not found:
+            print("Available backups:")
+            found = True
+        print(f"  - {branch_name.decode('utf-8', 'replace')}")
+    proc.stdout.close()
+    if proc.stderr:
+        # ls-remote only writes a few lines of errors, so reading them last can't block it
+        sys.stderr.write(proc.stderr.read().decode('utf-8', 'replace'))
+        proc.stderr.close()
+
+    if proc.wait() != 0:
+        print(f"Error executing command: {' '.join(command)}", file=sys.stderr)
+        sys.exit(1)
+    if not found:
         print("No backups found.")
-        return
-
-    print("Available backups:")
-    for branch in branches:
-        if branch:
-            branch_name = branch.split('\t')[1].replace('refs/heads/', '')
-            print(f"  - {branch_name}")
 
 def diff_backup(backup_name):
     """Shows the diff between the current state and a specific backup."""
     backup_url = get_backup_repo_url()
     if not backup_url:
         print("Error: Backup repository URL not set. Please run 'init' first.", file=sys.stderr)
-        return
+        return 1
 
     print(f"Fetching {backup_name} to compare...")
-    run_command(['git', 'fetch', backup_url, f'{backup_name}:{backup_name}', '--no-tags'], env=get_git_env())
+    # No --depth: a shallow fetch would make the whole local repository shallow.
+    # A backup is one commit on top of history the user already has, so a
+    # normal fetch only transfers the snapshot's own objects anyway
+    run_command([GIT, *FETCH_CONFIG, 'fetch', backup_url, f'{backup_name}:{backup_name}', '--no-tags'], env=get_git_env(), stdout_discard=True)
 
     print(f"\n--- Diff between current working directory and {backup_name} ---")
-    subprocess.run(['git', 'diff', backup_name])
+    run_command([GIT, 'diff', backup_name], check=False)
     print(f"--- End of diff ---")
 
-    run_command(['git', 'branch', '-D', backup_name])
+    run_command([GIT, 'branch', '-D', backup_name], quiet=True)
 
 def restore_backup(backup_name, auto_confirm=False):
     """Restores a backup to a new local branch."""
     backup_url = get_backup_repo_url()
     if not backup_url:
         print("Error: Backup repository URL not set. Please run 'init' first.", file=sys.stderr)
-        return
+        return 1
+
+    restore_branch_name = f"restore/{backup_name.removeprefix('backup/')}"
 
-    restore_branch_name = f"restore/{backup_name.replace('backup/', '')}"
-    
     # Check if restore branch already exists
-    result = run_command(['git', 'branch', '--list', restore_branch_name], capture_output=True, check=False)
-    if result.stdout.strip():
+    result = run_command([GIT, 'show-ref', '--verify', '--quiet', f'refs/heads/{restore_branch_name}'], check=False)
+    if result.returncode == 0:
         print(f"Error: Branch '{restore_branch_name}' already exists.", file=sys.stderr)
         print(f"To restore anyway, first delete the existing branch:", file=sys.stderr)
         print(f"  git branch -D {restore_branch_name}", file=sys.stderr)
-        return
+        return 1
     
-    # Confirm before restoring (unless auto-confirmed)
+    # Confirm before restoring (unless auto-confirmed). Without a terminal there
+    # is nobody to answer, so fail fast instead of blocking on input()
+    if not auto_confirm and not sys.stdin.isatty():
+        print("Error: Cannot ask for confirmation because stdin is not a terminal.", file=sys.stderr)
+        print("Re-run with --yes to restore without prompting.", file=sys.stderr)
+        return 1
     if not auto_confirm:
         response = input(f"This will create a new branch '{restore_branch_name}' with the backup contents. Continue? (y/N): ")
         if response.lower() != 'y':
@@ -199,10 +369,11 @@ def restore_backup(backup_name, auto_confirm=False):
     print(f"Fetching and restoring {backup_name} to a new local branch: {restore_branch_name}")
 
     try:
-        # First check if the backup exists in the remote
+        # First check if the backup exists in the remote. This runs only after
+        # the confirmation so an ssh prompt never competes with input()
         print("Checking if backup exists...")
         list_result = run_command(
-            ['git', 'ls-remote', '--heads', backup_url, f'refs/heads/{backup_name}'],
+            [GIT, 'ls-remote', '--heads', backup_url, f'refs/heads/{backup_name}'],
             capture_output=True,
             env=get_git_env(),
             check=False
@@ -210,15 +381,15 @@ def restore_backup(backup_name, auto_confirm=False):
         
         if not list_result.stdout.strip():
             print(f"Error: Backup '{backup_name}' not found in the remote repository.", file=sys.stderr)
-            return
+            return 1
         
         # Fetch the backup branch
         print("Fetching backup from remote repository...")
-        run_command(['git', 'fetch', backup_url, f'{backup_name}:{restore_branch_name}'], env=get_git_env())
+        run_command([GIT, *FETCH_CONFIG, 'fetch', backup_url, f'{backup_name}:{restore_branch_name}'], env=get_git_env(), stdout_discard=True)
 
         # Switch to the restore branch
         print(f"Switching to branch '{restore_branch_name}'...")
-        run_command(['git', 'checkout', restore_branch_name])
+        run_command([GIT, 'checkout', restore_branch_name], stdout_discard=True)
 
         print(f"\nSuccessfully restored backup.")
         print(f"Your project is now on branch '{restore_branch_name}' with the contents of {backup_name}.")
@@ -227,39 +398,142 @@ def restore_backup(backup_name, auto_confirm=False):
     except Exception as e:
         print(f"Error during restore: {e}", file=sys.stderr)
         # Try to clean up if restore branch was created but checkout failed
-        result = run_command(['git', 'branch', '--list', restore_branch_name], capture_output=True, check=False)
-        if result.stdout.strip():
+        result = run_command([GIT, 'show-ref', '--verify', '--quiet', f'refs/heads/{restore_branch_name}'], check=False)
+        if result.returncode == 0:
             print(f"Cleaning up partially created branch '{restore_branch_name}'...")
-            run_command(['git', 'branch', '-D', restore_branch_name], check=False)
+            run_command([GIT, 'branch', '-D', restore_branch_name], check=False, quiet=True)
+        return 1
 
 # --- FILESYSTEM ARCHIVE LOGIC ---
 
 def create_archive():
     """Creates a compressed tarball of the project, respecting .gitignore."""
-    if not is_git_repository():
-        print("Warning: Not a Git repository. Archiving all files without respecting .gitignore.")
-        files_to_archive = ['.']
-    else:
-        result = run_command(['git', 'ls-files', '-c', '-o', '--exclude-standard'], capture_output=True)
-        files_to_archive = result.stdout.strip().split('\n')
+    timestamp = _timestamp()
+    archive_name = f'stash-away-backup-{timestamp}.tar.gz'
 
-    if not files_to_archive:
-        print("No files to archive.", file=sys.stderr)
-        return
+    in_git_repo = is_git_repository()
+    if not in_git_repo:
+        print("Warning: Not a Git repository. Archiving all files without respecting .gitignore.")
 
-    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-    archive_name = f'stash-away-backup-{timestamp}.tar.gz'
     print(f"Creating archive: {archive_name}")
 
     try:
-        with tarfile.open(archive_name, "w:gz") as tar:
-            for item in files_to_archive:
-                if item:
-                    print(f"  - Adding {item}")
-                    tar.add(item, arcname=item)
+        if in_git_repo:
+            _create_archive_git(archive_name)
+        else:
+            tar_path = shutil.which('tar')
+            if tar_path:
+                _create_archive_native(tar_path, archive_name)
+            else:
+                _create_archive_python(archive_name)
         print(f"Successfully created archive: {archive_name}")
     except Exception as e:
         print(f"Error creating archive: {e}", file=sys.stderr)
+        return 1
+
+def _create_archive_git(archive_name):
+    """Creates the archive with git archive from a snapshot of the working tree."""
+    index_path, top_level = run_command(
+        [GIT, 'rev-parse', '--git-path', 'index', '--show-cdup'],
+        capture_output=True
+    ).stdout.splitlines()
+    top_level = top_level or '.'
+    if os.path.exists(os.path.join(top_level, '.gitmodules')):
+        # git archive leaves submodules as empty directories, so let tar pack
+        # the files git keeps instead; it descends into submodule directories
+        members = _archive_members(top_level)
+        tar_path = shutil.which('tar')
+        if tar_path:
+            _create_archive_native(tar_path, archive_name, members, top_level)
+        else:
+            _create_archive_python(archive_name, members, top_level)
+        return
+    # The snapshot holds tracked and untracked files minus ignored ones, and
+    # git archive streams it straight from the object database
+    tree = _snapshot_tree(index_path, top_level, _changed_paths())
+    # Run from the top level: from a subdirectory git archive would pack only
+    # that part of the tree, while the submodule path above packs it all
+    command = [GIT, '-C', top_level]
+    if shutil.which('pigz'):
+        # pigz compresses on all cores instead of git's single-threaded gzip
+        command += ['-c', 'tar.tar.gz.command=pigz -cn']
+    run_command(command + ['archive', '--format=tar.gz', '-o', os.path.abspath(archive_name), tree])
+
+def _archive_members(top_level):
+    """Returns the tracked and untracked, non-ignored paths under top_level, as bytes."""
+    listed = run_command(
+        [GIT, '-C', top_level, 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+        capture_output=True,
+        binary=True
+    ).stdout
+    # Tracked files deleted from the working tree are still listed; a
+    # submodule is listed once, as its directory
+    return [path for path in listed.split(b'\0') if path and os.path.lexists(os.path.join(os.fsencode(top_level), path))]
+
+def _create_archive_native(tar_path, archive_name, members=None, root='.'):
+    """Creates the archive with the system tar, compressing with pigz when available.
+    members lists the paths under root to pack; by default everything is packed."""
+    output_path = os.path.abspath(archive_name)
+    if members is None:
+        # Packing '.' would read the archive while tar writes it, and GNU tar then
+        # exits 1 with "file changed as we read it"; write it outside the tree
+        # and move it into place afterwards
+        import tempfile
+        temp_dir = tempfile.mkdtemp(prefix='stash-away-')
+        output_path = os.path.join(temp_dir, archive_name)
+    # pigz compresses on all cores; plain tar -z falls back to single-threaded gzip
+    if shutil.which('pigz'):
+        command = [tar_path, '--use-compress-program=pigz', '-cf', output_path]
+    else:
+        command = [tar_path, '-czf', output_path]
+    if members is not None:
+        # Names are read NUL-separated from stdin, relative to root
+        result = subprocess.run(command + ['-C', root, '--null', '-T', '-'], input=b''.join(path + b'\0' for path in members))
+    else:
+        # The temp directory may itself lie inside the tree being packed
+        try:
+            result = subprocess.run(command + [f'--exclude={archive_name}', f'--exclude={os.path.basename(temp_dir)}', '.'])
+            if result.returncode == 0:
+                shutil.move(output_path, archive_name)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"tar exited with status {result.returncode}")
+
+def _add_members(tar, members, root):
+    """Adds members (paths under root, as bytes) to tar, or everything when members is None."""
+    if members is None:
+        tar.add('.')
+        return
+    for path in members:
+        name = os.fsdecode(path)
+        tar.add(os.path.join(root, name), arcname=name)
+
+def _create_archive_python(archive_name, members=None, root='.'):
+    """Creates the archive with tarfile, for systems without a tar binary."""
+    # Only this fallback needs tarfile, which pulls in gzip/bz2/lzma on import
+    import tarfile
+    # A 2MiB copy buffer cuts the per-file read loop iterations
+    copybufsize = 2 * 1024 * 1024
+    pigz_path = shutil.which('pigz')
+    if not pigz_path:
+        # Level 6 halves the CPU cost of level 9 for a negligible size difference
+        with tarfile.open(archive_name, "w:gz", compresslevel=6, copybufsize=copybufsize) as tar:
+            _add_members(tar, members, root)
+        return
+
+    # Stream an uncompressed tar into pigz so compression runs on every core
+    # instead of zlib on this thread; the name keeps tar.add from packing the archive itself
+    with open(archive_name, 'wb') as out:
+        proc = subprocess.Popen([pigz_path, '-c'], stdin=subprocess.PIPE, stdout=out)
+        try:
+            with tarfile.open(archive_name, mode='w|', fileobj=proc.stdin, copybufsize=copybufsize) as tar:
+                _add_members(tar, members, root)
+        finally:
+            proc.stdin.close()
+            proc.wait()
+    if proc.returncode != 0:
+        raise RuntimeError(f"pigz exited with status {proc.returncode}")
 
 # --- MAIN CLI ---
 
@@ -267,25 +541,45 @@ def show_status():
     """Shows current backup configuration and repository status."""
     if not is_git_repository():
         print("Error: Not a Git repository.", file=sys.stderr)
-        return
+        return 1
         
     print("=== Stash-Away Status ===")
     
+    # The local git calls don't depend on the backup config, so start them
+    # first; they run while the config is read and while ls-remote is in flight
+    from concurrent.futures import ThreadPoolExecutor
+    executor = ThreadPoolExecutor(max_workers=3)
+    branch_future = executor.submit(run_command, [GIT, 'rev-parse', '--abbrev-ref', 'HEAD'], capture_output=True)
+    # -z output is only tested for emptiness, so it is never decoded
+    status_future = executor.submit(run_command, [GIT, 'status', '--porcelain', '-z'], capture_output=True, binary=True)
+
     # Show configuration
     backup_url = get_backup_repo_url()
     identity_file = get_backup_identity_file()
     print(f"\nConfiguration:")
     print(f"  Backup URL: {backup_url or 'Not configured (run: stash-away init <url>)'}")
     print(f"  SSH Identity: {identity_file or 'Using default SSH configuration'}")
-    
+
+    ls_remote_future = None
+    if backup_url:
+        ls_remote_future = executor.submit(
+            run_command,
+            [GIT, 'ls-remote', '--heads', '--sort=-refname', backup_url, 'refs/heads/backup/*'],
+            capture_output=True,
+            env=get_git_env(),
+            check=False,
+            binary=True
+        )
+    executor.shutdown(wait=False)
+
     # Show repository info
-    current_branch = run_command(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], capture_output=True).stdout.strip()
+    current_branch = branch_future.result().stdout.strip()
     print(f"\nRepository:")
     print(f"  Current branch: {current_branch}")
     
     # Show uncommitted changes
-    status_result = run_command(['git', 'status', '--porcelain'], capture_output=True)
-    if status_result.stdout.strip():
+    status_result = status_future.result()
+    if status_result.stdout:
         print(f"  Uncommitted changes: Yes")
     else:
         print(f"  Uncommitted changes: No")
@@ -293,17 +587,15 @@ def show_status():
     # Show last backup info if available
     if backup_url:
         print(f"\nFetching backup information...")
-        result = run_command(
-            ['git', 'ls-remote', '--heads', backup_url, 'refs/heads/backup/*'],
-            capture_output=True,
-            env=get_git_env(),
-            check=False
-        )
+        result = ls_remote_future.result()
         if result.returncode == 0 and result.stdout.strip():
-            branches = result.stdout.strip().split('\n')
-            last_backup = branches[-1].split('\t')[1].replace('refs/heads/', '') if branches else None
+            # Newest first: timestamped names sort chronologically, and git sorts them for us;
+            # only the one name shown is decoded
+            first_line, _, _ = result.stdout.partition(b'\n')
+            last_backup = first_line.split(b'\t', 1)[1].removeprefix(b'refs/heads/').decode('utf-8', 'replace')
+            total_backups = result.stdout.count(b'\n')
             print(f"  Last backup: {last_backup}")
-            print(f"  Total backups: {len(branches)}")
+            print(f"  Total backups: {total_backups}")
         else:
             print(f"  No backups found or unable to connect to backup repository")
 
@@ -357,17 +649,18 @@ COMMANDS:
 ┌─ COMPARE & RESTORE ─────────────────────────────────────────────────────────┐
 │ diff <backup_name>                                                          │
 │     Compare current state with a specific backup                           │
-│     Example: stash-away diff backup/2025-06-27_15-30-00                   │
+│     Example: stash-away diff backup/2025-06-27T15-30-00Z                  │
 │                                                                             │
 │ restore <backup_name> [--yes]                                              │
 │     Restore backup to new local branch (use --yes to skip confirmation)   │
-│     Example: stash-away restore backup/2025-06-27_15-30-00                │
-│              stash-away restore backup/2025-06-27_15-30-00 --yes          │
+│     Example: stash-away restore backup/2025-06-27T15-30-00Z               │
+│              stash-away restore backup/2025-06-27T15-30-00Z --yes         │
 └─────────────────────────────────────────────────────────────────────────────┘
 
 ┌─ INTERFACE ─────────────────────────────────────────────────────────────────┐
-│ ui                                                                          │
+│ ui [--yes]                                                                  │
 │     Launch interactive text-based user interface                           │
+│     --yes answers yes to every confirmation prompt (for scripted runs)      │
 │     Navigation: ↑↓ arrows, Enter to select, Q to quit                     │
 │     Example: stash-away ui                                                 │
 │                                                                             │
@@ -388,8 +681,8 @@ WORKFLOW EXAMPLES:
     
   Working with backups:
     stash-away list              # See available backups
-    stash-away diff backup/2025-06-27_15-30-00    # Compare with backup
-    stash-away restore backup/2025-06-27_15-30-00 # Restore if needed
+    stash-away diff backup/2025-06-27T15-30-00Z    # Compare with backup
+    stash-away restore backup/2025-06-27T15-30-00Z # Restore if needed
 
 CONFIGURATION:
     Settings are stored in your project's Git config:
@@ -407,8 +700,40 @@ For more information, visit: https://github.com/dmissoh/stash-away
 """
     print(help_text)
 
-def main():
-    """Main function to parse arguments and call the appropriate handler."""
+def run_ui(auto_confirm=False):
+    """Launches the interactive text-based user interface."""
+    # Check if we're in a git repository first
+    if not is_git_repository():
+        print("Error: Not in a git repository", file=sys.stderr)
+        sys.exit(1)
+    # Import and run TUI
+    try:
+        # Try importing rich first to give better error message
+        try:
+            import rich
+        except ImportError:
+            print("Error: The 'rich' library is required for the UI mode.", file=sys.stderr)
+            print("Please install it with: pip install rich", file=sys.stderr)
+            sys.exit(1)
+        
+        # Import and run the TUI
+        import stash_away_tui
+        app = stash_away_tui.StashAwayTUI(auto_confirm=auto_confirm)
+        app.run()
+    except ImportError as e:
+        print("Error: Could not import TUI module.", file=sys.stderr)
+        print(f"Details: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error running UI: {str(e)}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+def main(argv=None):
+    """Main function to parse arguments and call the appropriate handler.
+    argv defaults to sys.argv[1:]; the UI passes its own to run commands in-process.
+    Returns the command's exit status."""
     parser = argparse.ArgumentParser(
         description="A CLI tool to back up a project to a personal Git repository or a local archive.",
         epilog="Example usage: stash-away push\nFor beginners: stash-away ui (interactive interface)"
@@ -418,72 +743,51 @@ def main():
     init_parser = subparsers.add_parser('init', help='Initialize the backup Git repository URL for the project.')
     init_parser.add_argument('url', help='The HTTPS or SSH URL of your personal backup Git repository.')
     init_parser.add_argument('--identity-file', help='Path to the SSH private key file to use for authentication (e.g., ~/.ssh/id_rsa_personal)')
+    init_parser.set_defaults(func=lambda args: init_backup_repo(args.url, args.identity_file))
 
     push_parser = subparsers.add_parser('push', help='Backup current changes to the remote Git repository.')
+    # Only hand the process over to git when a user is watching the terminal;
+    # scripts and the UI read the messages printed after the push
+    push_parser.set_defaults(func=lambda args: push_to_backup(exec_push=sys.stdout.isatty()))
 
     archive_parser = subparsers.add_parser('archive', help='Create a local compressed archive of the project.')
+    archive_parser.set_defaults(func=lambda args: create_archive())
 
     list_parser = subparsers.add_parser('list', help='List all available backups in the remote repository.')
+    list_parser.set_defaults(func=lambda args: list_backups())
 
     diff_parser = subparsers.add_parser('diff', help='Compare the current project state with a specific backup.')
-    diff_parser.add_argument('backup_name', help='The full name of the backup branch to compare (e.g., backup/2025-06-27_15-30-00).')
+    diff_parser.add_argument('backup_name', help='The full name of the backup branch to compare (e.g., backup/2025-06-27T15-30-00Z).')
+    diff_parser.set_defaults(func=lambda args: diff_backup(args.backup_name))
 
     restore_parser = subparsers.add_parser('restore', help='Restore a backup to a new local branch.')
     restore_parser.add_argument('backup_name', help='The full name of the backup branch to restore.')
     restore_parser.add_argument('--yes', '-y', action='store_true', help='Auto-confirm restore without prompting')
+    restore_parser.set_defaults(func=lambda args: restore_backup(args.backup_name, auto_confirm=args.yes))
     
     status_parser = subparsers.add_parser('status', help='Show current backup configuration and repository status.')
+    status_parser.set_defaults(func=lambda args: show_status())
     
     ui_parser = subparsers.add_parser('ui', help='Launch interactive text-based user interface.')
+    ui_parser.add_argument('--yes', '-y', action='store_true', help='Answer yes to every confirmation prompt')
+    ui_parser.set_defaults(func=lambda args: run_ui(auto_confirm=args.yes))
     
     help_parser = subparsers.add_parser('help', help='Show detailed help and usage examples.')
+    help_parser.set_defaults(func=lambda args: show_help())
 
-    args = parser.parse_args()
-
-    if args.command == 'init':
-        init_backup_repo(args.url, args.identity_file)
-    elif args.command == 'push':
-        push_to_backup()
-    elif args.command == 'archive':
-        create_archive()
-    elif args.command == 'list':
-        list_backups()
-    elif args.command == 'diff':
-        diff_backup(args.backup_name)
-    elif args.command == 'restore':
-        restore_backup(args.backup_name, auto_confirm=args.yes)
-    elif args.command == 'status':
-        show_status()
-    elif args.command == 'help':
-        show_help()
-    elif args.command == 'ui':
-        # Check if we're in a git repository first
-        if not is_git_repository():
-            print("Error: Not in a git repository", file=sys.stderr)
-            sys.exit(1)
-        # Import and run TUI
-        try:
-            # Try importing rich first to give better error message
-            try:
-                import rich
-            except ImportError:
-                print("Error: The 'rich' library is required for the UI mode.", file=sys.stderr)
-                print("Please install it with: pip install rich", file=sys.stderr)
-                sys.exit(1)
-            
-            # Import and run the TUI
-            import stash_away_tui
-            app = stash_away_tui.StashAwayTUI()
-            app.run()
-        except ImportError as e:
-            print("Error: Could not import TUI module.", file=sys.stderr)
-            print(f"Details: {str(e)}", file=sys.stderr)
-            sys.exit(1)
-        except Exception as e:
-            print(f"Error running UI: {str(e)}", file=sys.stderr)
-            import traceback
-            traceback.print_exc()
-            sys.exit(1)
+    args = parser.parse_args(argv)
+
+    # A long-lived caller like the UI runs many commands in one process, and
+    # config or remote state may have changed since the last one
+    get_backup_config.cache_clear()
+    get_git_env.cache_clear()
+
+    if _GIT_PATH is None and args.command != 'help':
+        print("Error: Command 'git' not found. Is it in your PATH?", file=sys.stderr)
+        sys.exit(1)
+
+    # Commands return 1 after reporting an error, and None when they succeed
+    return args.func(args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,15 +1,29 @@
 #!/usr/bin/env python3
+import contextlib
+from collections import deque
+import functools
+import importlib.util
+import io
+import re
+import select
+import signal
 import subprocess
 import sys
 import os
-from datetime import datetime
-from rich.console import Console
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
-from rich.layout import Layout
 from rich.live import Live
-from rich.prompt import Prompt, Confirm
-import readline
+from rich.spinner import Spinner
+from rich.prompt import Confirm
+from rich.markup import escape
+try:
+    # Importing readline gives input() line editing; it's missing on Windows
+    import readline
+except ImportError:
+    readline = None
 try:
     import termios
     import tty
@@ -21,58 +35,173 @@ from rich.align import Align
 from rich import box
 import time
 
+# Rich markup tags such as [cyan] or [/bold], stripped from plain prompts
+_MARKUP_RE = re.compile(r'\[/?[^\]]*\]')
+
+def _plain(text):
+    """Strip Rich markup tags from text"""
+    # Most prompts carry no markup at all, so skip the regex for them
+    return _MARKUP_RE.sub('', text) if '[' in text else text
+
+# Prompts and panel titles repeat on every visit to a screen, so each markup
+# string is parsed into a Text once (Panel and Prompt copy it before styling)
+_markup = functools.lru_cache(maxsize=64)(Text.from_markup)
+
+# Shown under the menu after a key that selects nothing
+_INVALID_OPTION = Text("Invalid option. Please try again.", style="red")
+
+def load_cli():
+    """Load the stash-away CLI module so commands can run in this process"""
+    # Launched via "stash-away ui" (also the only way in the bundled build),
+    # the CLI is already running as __main__
+    main_module = sys.modules.get('__main__')
+    if hasattr(main_module, 'push_to_backup'):
+        return main_module
+    try:
+        # stash-away.py isn't an importable module name, so load it by path
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stash-away.py')
+        spec = importlib.util.spec_from_file_location('stash_away', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    except (OSError, ImportError):
+        return None
+
+def has_git_dir(path):
+    """Check for a .git entry in path or any parent, without running git"""
+    while True:
+        try:
+            # A worktree or submodule has a .git file rather than a directory
+            os.stat(os.path.join(path, '.git'))
+            return True
+        except OSError:
+            parent = os.path.dirname(path)
+            if parent == path:
+                return False
+            path = parent
+
+class OutputTail(io.StringIO):
+    """StringIO that also keeps the last lines written, so a spinner can show progress"""
+    def __init__(self, maxlen=40):
+        super().__init__()
+        self.lines = deque(maxlen=maxlen)
+        self._partial = ""
+    
+    def write(self, text):
+        *complete, self._partial = (self._partial + text).split("\n")
+        self.lines.extend(complete)
+        return super().write(text)
+
+class SpinnerWithOutput:
+    """Renders a spinner above the latest lines of a command's output"""
+    def __init__(self, spinner, output):
+        self.spinner = spinner
+        self.output = output
+    
+    def __rich__(self):
+        # Rebuilt on every refresh, but only from the bounded tail of the output
+        if not self.output.lines:
+            return self.spinner
+        return Group(self.spinner, Panel(Text("\n".join(self.output.lines)), border_style="dim", box=box.ROUNDED))
+
 class StashAwayTUI:
-    def __init__(self):
-        self.console = Console()
+    # Seconds each command may run as a child process: status and list only
+    # query the remote's refs, while push and restore can move a lot of data
+    _TIMEOUTS = {"status": 15, "list": 15, "init": 15, "diff": 30, "archive": 120, "push": 300, "restore": 300}
+    
+    def __init__(self, cli=None, auto_confirm=False, console=None):
+        # Bind the real stdout: commands run in-process with stdout redirected,
+        # and spinners must keep drawing on the terminal meanwhile
+        self.console = console or Console(file=sys.stdout)
+        self.cli = cli or load_cli()
+        # Command line for the fallback that runs stash-away as a child process;
+        # a PyInstaller bundle is itself the stash-away executable
+        if getattr(sys, 'frozen', False):
+            self._cmd_prefix = [sys.executable]
+        else:
+            self._cmd_prefix = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stash-away.py')]
+        # The header never changes and the menu only with the selection, so
+        # their panels are built once instead of on every redraw
+        self._header_panel = Panel(
+            Align.center(
+                "[bold yellow]STASH-AWAY[/bold yellow]\n[dim]Git Repository Backup Tool[/dim]",
+                vertical="middle"
+            ),
+            box=box.DOUBLE,
+            style="cyan",
+            height=5
+        )
+        self._menu_panels = {}
+        self._menu_hint = Text.from_markup("[dim]Use ↑↓ arrows to navigate, Enter to select, or press number keys[/dim]")
+        # Error or invalid-key message shown under the menu
+        self._message = None
+        # Output of the last "list" command and when it was fetched
+        self._list_cache = None
+        self._list_cache_ts = 0
+        # Last list output and the panel built from it
+        self._list_panel_cache = (None, None)
+        self._help_panel = None  # Built the first time help is shown
+        # Runs read-only queries such as the backup list while a screen draws
+        self._pool = ThreadPoolExecutor(max_workers=2)
+        # In-process commands share sys.stdout with every thread they start,
+        # so the lock keeps them from running at the same time
+        self._command_lock = threading.Lock()
+        # Terminal settings from startup, put back after every command in case
+        # a child such as an ssh passphrase prompt left the terminal altered
+        self._saved_termios = None
+        if TERMIOS_AVAILABLE and sys.stdin.isatty():
+            self._saved_termios = termios.tcgetattr(sys.stdin.fileno())
+        self._cbreak = False  # Set while cbreak_mode is active
+        self.auto_confirm = auto_confirm  # Answer yes to every confirmation
         self.running = True
         self.selected_index = 0  # Currently selected menu item
-        self.menu_items = [
-            ("Show Status", self.show_status),
-            ("Push Backup", self.push_backup),
-            ("Create Archive", self.create_archive),
-            ("List Backups", self.list_backups),
-            ("Initialize Repository", self.initialize),
-            ("Compare with Backup", self.compare_backup),
-            ("Restore Backup", self.restore_backup),
-            ("Quit", self.quit_app)
-        ]
-        # Enable readline for better input handling
+        # Menu entries keyed by their shortcut, in display order
+        self.menu_items = {
+            "1": ("Show Status", self.show_status),
+            "2": ("Push Backup", self.push_backup),
+            "3": ("Create Archive", self.create_archive),
+            "4": ("List Backups", self.list_backups),
+            "5": ("Initialize Repository", self.initialize),
+            "6": ("Compare with Backup", self.compare_backup),
+            "7": ("Restore Backup", self.restore_backup),
+            "q": ("Quit", self.quit_app)
+        }
+        self.menu_keys = list(self.menu_items)
+        # Actions by menu position, so Enter and number keys share one lookup
+        self._actions = tuple(action for _, action in self.menu_items.values())
+        
+    def run_command(self, args, stdout=None):
+        """Run a stash-away command given as a list of arguments and return output.
+        An OutputTail passed as stdout receives the output while the command runs."""
+        return self.run_command_rc(args, stdout)[0]
+    
+    def run_command_rc(self, args, stdout=None):
+        """Run a stash-away command and return its output and exit status"""
         try:
-            readline.set_startup_hook(None)
-        except:
-            pass
-        
-    def run_command(self, command):
-        """Run a command and return output"""
+            return self._run_command(args, stdout)
+        finally:
+            if self._saved_termios is not None:
+                termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, self._saved_termios)
+    
+    def _run_command(self, args, stdout=None):
+        """Run a stash-away command in-process, or as a child process as a fallback"""
         try:
-            import shlex
-            
-            # Parse the command into parts
-            cmd_parts = shlex.split(command)
-            
-            # Determine the correct way to call stash-away
-            if getattr(sys, 'frozen', False):
-                # Running in a PyInstaller bundle
-                if cmd_parts[0] == "python3" and cmd_parts[1] == "stash-away.py":
-                    # Replace python3 stash-away.py with the executable
-                    cmd_parts = [sys.executable] + cmd_parts[2:]
-            else:
-                # Running from source
-                if cmd_parts[0] == "python3" and cmd_parts[1] == "stash-away.py":
-                    # Keep as is
-                    pass
-                else:
-                    # Shouldn't happen but handle it
-                    cmd_parts = ["python3", "stash-away.py"] + cmd_parts
+            # Run stash-away commands in this process instead of starting a new interpreter
+            if self.cli is not None:
+                return self.run_in_process(args, stdout)
             
             # Debug output (uncomment for debugging)
-            # self.console.print(f"[dim]Debug: Running command: {' '.join(cmd_parts)}[/dim]")
+            # self.console.print(f"[dim]Debug: Running command: {' '.join(self._cmd_prefix + args)}[/dim]")
+            
+            timeout = self._TIMEOUTS.get(args[0] if args else None, 30)
+            if stdout is not None:
+                return self.stream_subprocess(self._cmd_prefix + args, stdout, timeout)
             
             result = subprocess.run(
-                cmd_parts, 
+                self._cmd_prefix + args, 
                 capture_output=True, 
                 text=True,
-                timeout=120  # Increased timeout for network operations like restore
+                timeout=timeout
             )
             
             # Combine stdout and stderr for complete output
@@ -80,25 +209,140 @@ class StashAwayTUI:
             if result.stderr:
                 output += "\n" + result.stderr
             
-            return output if output else "Command completed with no output."
-        except subprocess.TimeoutExpired:
-            return "[red]Error: Command timed out after 2 minutes. This may indicate network issues or authentication problems.[/red]"
-        except Exception as e:
-            return f"[red]Error: {str(e)}[/red]"
+            return (escape(output) if output else "Command completed with no output."), result.returncode
+        except subprocess.TimeoutExpired as e:
+            return f"[red]Error: Command timed out after {e.timeout:g} seconds. This may indicate network issues or authentication problems.[/red]", 1
+        except (OSError, ValueError) as e:
+            return f"[red]Error: {escape(str(e))}[/red]", 1
+    
+    def stream_subprocess(self, command, stdout, timeout):
+        """Run a child process, writing its output to stdout line by line as it arrives"""
+        # Output is interleaved into one stream so progress shows in order,
+        # and the child is asked not to hold its output back in a pipe buffer
+        # Its own session makes the child a process group leader, so the
+        # watchdog can reach git and ssh below it as well
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+                                env=dict(os.environ, PYTHONUNBUFFERED="1"), start_new_session=os.name != 'nt')
+        timed_out = threading.Event()
+        
+        def kill():
+            timed_out.set()
+            # Grandchildren hold the pipe open too; reading only ends once they are gone
+            if os.name != 'nt':
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            else:
+                proc.kill()
+        
+        # Reading blocks, so a timer enforces the timeout by killing the child
+        watchdog = threading.Timer(timeout, kill)
+        watchdog.start()
+        try:
+            for line in proc.stdout:
+                stdout.write(line)
+            returncode = proc.wait()
+        finally:
+            watchdog.cancel()
+            proc.stdout.close()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(command, timeout)
+        
+        output = stdout.getvalue()
+        # Command output is plain text; escape it so brackets in it, such as a
+        # backup name, are not read as markup by the panel showing it
+        return (escape(output) if output else "Command completed with no output."), returncode
+    
+    def get_backup_list(self, ttl=30):
+        """Return the output of the list command, reusing it for ttl seconds"""
+        if self._list_cache is None or time.monotonic() - self._list_cache_ts >= ttl:
+            output, returncode = self.run_command_rc(["list"])
+            if returncode != 0:
+                # Show the error, but fetch again next time instead of caching it
+                self._list_cache = None
+                return output
+            self._list_cache = output
+            self._list_cache_ts = time.monotonic()
+        return self._list_cache
+    
+    def has_uncommitted_changes(self):
+        """Return True if the working tree has changes, without going to the network"""
+        # A plain git call instead of the status command: it needs no remote
+        # and writes nothing to sys.stdout, so it can run beside the list
+        try:
+            result = subprocess.run(
+                ["git", "status", "--porcelain", "-z"],
+                capture_output=True,
+                timeout=10
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return result.returncode == 0 and bool(result.stdout)
+    
+    def backup_list_panel(self, list_output):
+        """Return the "Available Backups" panel, reusing it while the list is unchanged"""
+        # The cached list comes back as the very same string, so an identity
+        # check is enough to skip rebuilding the panel on every visit
+        cached_output, panel = self._list_panel_cache
+        if cached_output is not list_output:
+            panel = Panel(
+                list_output,
+                title=_markup("[bold]Available Backups[/bold]"),
+                title_align="left",
+                border_style="blue",
+                box=box.ROUNDED
+            )
+            self._list_panel_cache = (list_output, panel)
+        return panel
+    
+    def run_in_process(self, args, stdout=None):
+        """Run a stash-away command in-process and return its output and exit status"""
+        stdout, stderr = stdout or io.StringIO(), io.StringIO()
+        returncode = 0
+        with self._command_lock, contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                returncode = self.cli.main(args) or 0
+            except SystemExit as e:
+                # Commands exit on errors after printing them to stderr
+                if isinstance(e.code, int):
+                    returncode = e.code
+                elif e.code is not None:
+                    returncode = 1
+        
+        # Combine stdout and stderr for complete output
+        output = stdout.getvalue()
+        if stderr.getvalue():
+            output += "\n" + stderr.getvalue()
+        
+        return (escape(output) if output else "Command completed with no output."), returncode
+    
+    def spinner(self, message, spinner="dots", output=None):
+        """Show a spinner with a message while a command runs, above its output if given"""
+        renderable = Spinner(spinner, text=_markup(message), style="status.spinner")
+        if output is not None:
+            renderable = SpinnerWithOutput(renderable, output)
+        # Unlike console.status, leave sys.stdout alone: a background command
+        # may have it redirected, and swapping it here would race that
+        return Live(
+            renderable,
+            console=self.console,
+            refresh_per_second=12.5,
+            transient=True,
+            redirect_stdout=False,
+            redirect_stderr=False
+        )
     
     def safe_input(self, prompt_text, default="", strip_markup=True):
         """Safe input function that handles terminal escape sequences properly"""
         try:
             if strip_markup:
                 # Remove rich markup for cleaner input
-                import re
-                clean_prompt = re.sub(r'\[/?[^\]]*\]', '', prompt_text)
+                clean_prompt = _plain(prompt_text)
                 self.console.print(f"[cyan]{clean_prompt}[/cyan]", end="")
             else:
                 self.console.print(prompt_text, end="")
             
-            sys.stdout.flush()  # Ensure prompt is displayed immediately
-            
             # Read input line with readline support for backspace handling
             try:
                 result = input().strip()
@@ -109,17 +353,22 @@ class StashAwayTUI:
             return result if result else default
         except (EOFError, KeyboardInterrupt):
             return default
-        except Exception:
+        except (UnicodeDecodeError, OSError):
             # Fallback to basic input if rich features fail
             try:
-                import re
-                clean_prompt = re.sub(r'\[/?[^\]]*\]', '', prompt_text)
+                clean_prompt = _plain(prompt_text)
                 print(clean_prompt, end="")
                 result = input().strip()
                 return result if result else default
-            except:
+            except (EOFError, KeyboardInterrupt, OSError):
                 return default
     
+    def confirm(self, prompt):
+        """Ask a yes/no question, or answer yes straight away in --yes mode"""
+        if self.auto_confirm:
+            return True
+        return Confirm.ask(prompt)
+    
     def get_key(self):
         """Get a single keypress from the user"""
         if not TERMIOS_AVAILABLE:
@@ -133,82 +382,138 @@ class StashAwayTUI:
                     return 'QUIT'
                 else:
                     return 'ENTER'  # Default to enter
+            except EOFError:
+                return 'EOF'
             except:
                 return 'QUIT'
         
-        try:
-            # Save original terminal settings
-            fd = sys.stdin.fileno()
-            old_settings = termios.tcgetattr(fd)
-            
-            try:
-                # Set terminal to raw mode
-                tty.setraw(sys.stdin.fileno())
-                
-                # Read a single character
-                key = sys.stdin.read(1)
-                
-                # Handle escape sequences (arrow keys)
-                if ord(key) == 27:  # ESC sequence
-                    key += sys.stdin.read(2)
-                    if key == '\x1b[A':  # Up arrow
-                        return 'UP'
-                    elif key == '\x1b[B':  # Down arrow
-                        return 'DOWN'
-                    elif key == '\x1b[C':  # Right arrow
-                        return 'RIGHT'
-                    elif key == '\x1b[D':  # Left arrow
-                        return 'LEFT'
-                    else:
-                        return 'ESC'
-                elif ord(key) == 10 or ord(key) == 13:  # Enter
-                    return 'ENTER'
-                elif ord(key) == 3:  # Ctrl+C
-                    return 'CTRL_C'
-                elif key == 'q' or key == 'Q':
-                    return 'QUIT'
-                elif key == 'h' or key == 'H':
-                    return 'H'  # Normalize both to 'H'
-                elif key in '12345678':
-                    return key
-                else:
-                    return key.upper()
-                    
-            finally:
-                # Restore original terminal settings
-                termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-                
-        except Exception:
-            # Fallback to regular input if terminal manipulation fails
+        if not self._cbreak:
+            # Not on a terminal, so keys can't be read one at a time
             try:
                 return input().strip()
-            except:
+            except EOFError:
+                return 'EOF'
+            except OSError:
                 return 'QUIT'
+        
+        # One unbuffered read usually returns a whole arrow-key sequence at once
+        fd = sys.stdin.fileno()
+        data = os.read(fd, 8)
+        if not data:
+            return 'EOF'
+        
+        # Handle escape sequences (arrow keys)
+        if data[0] == 27:  # ESC sequence
+            if len(data) < 3:
+                # Either the rest of the sequence is still on its way or Escape
+                # was pressed on its own; wait briefly instead of blocking
+                if not select.select([fd], [], [], 0.05)[0]:
+                    return 'ESC'
+                data += os.read(fd, 3 - len(data))
+            if data[:3] == b'\x1b[A':  # Up arrow
+                return 'UP'
+            elif data[:3] == b'\x1b[B':  # Down arrow
+                return 'DOWN'
+            elif data[:3] == b'\x1b[C':  # Right arrow
+                return 'RIGHT'
+            elif data[:3] == b'\x1b[D':  # Left arrow
+                return 'LEFT'
+            else:
+                return 'ESC'
+        
+        key = data.decode(errors='replace')[0]
+        if ord(key) == 10 or ord(key) == 13:  # Enter
+            return 'ENTER'
+        elif key == 'q' or key == 'Q':
+            return 'QUIT'
+        elif key == 'h' or key == 'H':
+            return 'H'  # Normalize both to 'H'
+        elif key in '12345678':
+            return key
+        else:
+            return key.upper()
+    
+    @contextlib.contextmanager
+    def cbreak_mode(self):
+        """Read keys one at a time without echo for the duration of the block"""
+        # Switched once per menu visit rather than around every keypress; cbreak
+        # rather than raw keeps output processing on for the Live menu redraws,
+        # and Ctrl+C arrives as KeyboardInterrupt, which run() handles
+        if self._saved_termios is None:
+            yield
+            return
+        fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+        self._cbreak = True
+        try:
+            yield
+        finally:
+            self._cbreak = False
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
     
     def show_header(self):
         """Display the header"""
-        header = Panel(
-            Align.center(
-                "[bold yellow]STASH-AWAY[/bold yellow]\n[dim]Git Repository Backup Tool[/dim]",
-                vertical="middle"
-            ),
-            box=box.DOUBLE,
-            style="cyan",
-            height=5
-        )
-        self.console.print(header)
+        self.console.print(self._header_panel)
         self.console.print()
     
-    def show_menu(self):
-        """Display the main menu with cursor navigation"""
+    def new_screen(self, *renderables):
+        """Clear the screen and draw the header and any renderables in one write"""
+        # The console holds its output until the block ends
+        with self.console:
+            self.console.clear()
+            self.show_header()
+            for renderable in renderables:
+                self.console.print(renderable)
+    
+    def menu_screen(self):
+        """Build the menu, navigation hint and any message as one renderable"""
+        # The menu only changes with the selection, so each variant is built once
+        menu_panel = self._menu_panels.get(self.selected_index)
+        if menu_panel is None:
+            menu_panel = self._menu_panels[self.selected_index] = self.build_menu_panel()
+        parts = [menu_panel, Text(), self._menu_hint]
+        if self._message is not None:
+            parts.append(self._message)
+        return Group(*parts)
+    
+    def read_menu_key(self):
+        """Show the menu and return the first key that selects something"""
+        # Navigation and typos only redraw the menu region in place, leaving the
+        # header alone instead of clearing and repainting the whole screen
+        live = Live(self.menu_screen(), console=self.console, auto_refresh=False,
+                    redirect_stdout=False, redirect_stderr=False)
+        # The console holds its output until the block ends, so clearing the
+        # screen, the header and the first menu frame reach the terminal in one write
+        with self.console:
+            self.new_screen()
+            live.start(refresh=True)
+        with self.cbreak_mode(), live:
+            while True:
+                shown = (self.selected_index, self._message)
+                key = self.get_key()
+                # A message from the last action or typo lasts until the next key
+                self._message = None
+                if key == 'UP':
+                    self.selected_index = (self.selected_index - 1) % len(self.menu_items)
+                elif key == 'DOWN':
+                    self.selected_index = (self.selected_index + 1) % len(self.menu_items)
+                elif key in ('ENTER', 'QUIT', 'Q', 'H', 'EOF') or key in self.menu_items:
+                    return key
+                else:
+                    self._message = _INVALID_OPTION
+                # Repeated typos leave the screen as it is; skip the redraw
+                if (self.selected_index, self._message) != shown:
+                    live.update(self.menu_screen(), refresh=True)
+    
+    def build_menu_panel(self):
+        """Build the main menu panel for the current selection"""
         table = Table(show_header=False, box=None)
         table.add_column("Selector", style="cyan", width=3)
         table.add_column("Key", style="cyan", width=5)
         table.add_column("Action", style="white")
         
-        for idx, (action_name, _) in enumerate(self.menu_items):
-            key = str(idx + 1) if idx < 7 else "q"
-            
+        for idx, (key, (action_name, _)) in enumerate(self.menu_items.items()):
             if idx == self.selected_index:
                 # Highlight selected item
                 selector = "▶"
@@ -221,117 +526,104 @@ class StashAwayTUI:
             
             table.add_row(selector, key_style, action_style)
         
-        menu_panel = Panel(
+        return Panel(
             table,
-            title="[bold]Main Menu[/bold] [dim](↑↓ to navigate, Enter to select, H for help, q to quit)[/dim]",
+            title=_markup("[bold]Main Menu[/bold] [dim](↑↓ to navigate, Enter to select, H for help, q to quit)[/dim]"),
             title_align="left",
             border_style="green",
             box=box.ROUNDED
         )
-        
-        self.console.print(menu_panel)
-        self.console.print()
     
     def show_status(self):
         """Show repository status"""
-        self.console.clear()
-        self.show_header()
+        self.new_screen()
         
-        with self.console.status("[bold green]Fetching status...[/bold green]"):
-            output = self.run_command("python3 stash-away.py status")
+        with self.spinner("[bold green]Fetching status...[/bold green]"):
+            output = self.run_command(["status"])
         
         status_panel = Panel(
             output,
-            title="[bold]Repository Status[/bold]",
+            title=_markup("[bold]Repository Status[/bold]"),
             title_align="left",
             border_style="blue",
             box=box.ROUNDED
         )
         
-        self.console.print(status_panel)
-        self.console.print("\n[dim]Press Enter to continue...[/dim]")
-        input()
+        self.wait_for_key(status_panel)
     
     def push_backup(self):
         """Push backup to remote repository"""
-        self.console.clear()
-        self.show_header()
-        
-        if Confirm.ask("[yellow]Create a new backup?[/yellow]"):
-            with self.console.status("[bold green]Creating backup...[/bold green]", spinner="dots"):
-                output = self.run_command("python3 stash-away.py push")
+        self.new_screen()
+        result = None
+        
+        if self.confirm(_markup("[yellow]Create a new backup?[/yellow]")):
+            # Show the push's messages as they are printed instead of only at the end
+            progress = OutputTail()
+            with self.spinner("[bold green]Creating backup...[/bold green]", spinner="dots", output=progress):
+                output, returncode = self.run_command_rc(["push"], progress)
             
-            if "Push successful." in output or "Backup complete!" in output:
-                self.console.print(Panel(
+            if returncode == 0:
+                # The new backup branch isn't in the cached list yet
+                self._list_cache = None
+                result = Panel(
                     output,
-                    title="[bold green]✓ Backup Successful[/bold green]",
+                    title=_markup("[bold green]✓ Backup Successful[/bold green]"),
                     border_style="green",
                     box=box.ROUNDED
-                ))
+                )
             else:
-                self.console.print(Panel(
+                result = Panel(
                     output,
-                    title="[bold red]✗ Backup Failed[/bold red]",
+                    title=_markup("[bold red]✗ Backup Failed[/bold red]"),
                     border_style="red",
                     box=box.ROUNDED
-                ))
+                )
         
-        self.console.print("\n[dim]Press Enter to continue...[/dim]")
-        input()
+        self.wait_for_key(result)
     
     def create_archive(self):
         """Create local archive"""
-        self.console.clear()
-        self.show_header()
+        self.new_screen()
+        result = None
         
-        if Confirm.ask("[yellow]Create a local archive?[/yellow]"):
-            with self.console.status("[bold green]Creating archive...[/bold green]", spinner="dots"):
-                output = self.run_command("python3 stash-away.py archive")
+        if self.confirm(_markup("[yellow]Create a local archive?[/yellow]")):
+            with self.spinner("[bold green]Creating archive...[/bold green]", spinner="dots"):
+                output, returncode = self.run_command_rc(["archive"])
             
-            if "Successfully created archive:" in output:
-                self.console.print(Panel(
+            if returncode == 0:
+                result = Panel(
                     output,
-                    title="[bold green]✓ Archive Created[/bold green]",
+                    title=_markup("[bold green]✓ Archive Created[/bold green]"),
                     border_style="green",
                     box=box.ROUNDED
-                ))
+                )
             else:
-                self.console.print(Panel(
+                result = Panel(
                     output,
-                    title="[bold red]✗ Archive Failed[/bold red]",
+                    title=_markup("[bold red]✗ Archive Failed[/bold red]"),
                     border_style="red",
                     box=box.ROUNDED
-                ))
+                )
         
-        self.console.print("\n[dim]Press Enter to continue...[/dim]")
-        input()
+        self.wait_for_key(result)
     
     def list_backups(self):
         """List all backups"""
-        self.console.clear()
-        self.show_header()
+        self.new_screen()
         
-        with self.console.status("[bold green]Fetching backups...[/bold green]"):
-            output = self.run_command("python3 stash-away.py list")
+        with self.spinner("[bold green]Fetching backups...[/bold green]"):
+            # Always fetch here, refreshing the list compare and restore reuse
+            output = self.get_backup_list(ttl=0)
         
-        backups_panel = Panel(
-            output,
-            title="[bold]Available Backups[/bold]",
-            title_align="left",
-            border_style="blue",
-            box=box.ROUNDED
-        )
+        backups_panel = self.backup_list_panel(output)
         
-        self.console.print(backups_panel)
-        self.console.print("\n[dim]Press Enter to continue...[/dim]")
-        input()
+        self.wait_for_key(backups_panel)
     
     def initialize(self):
         """Initialize backup repository"""
-        self.console.clear()
-        self.show_header()
+        result = None
         
-        self.console.print(Panel(
+        self.new_screen(Panel(
             "[bold]Initialize Backup Repository[/bold]\n\n"
             "Enter the URL of your backup repository (e.g., git@github.com:user/backups.git)",
             border_style="yellow",
@@ -343,117 +635,133 @@ class StashAwayTUI:
         if url:
             ssh_key = self.safe_input("SSH Key Path (optional, press Enter to skip): ", "")
             
-            # Properly escape the URL and SSH key path
-            import shlex
-            cmd_parts = ["python3", "stash-away.py", "init", url]
+            cmd_parts = ["init", url]
             if ssh_key:
                 cmd_parts.extend(["--identity-file", ssh_key])
             
-            cmd = " ".join(shlex.quote(part) for part in cmd_parts)
-            
-            with self.console.status("[bold green]Initializing...[/bold green]"):
-                output = self.run_command(cmd)
+            with self.spinner("[bold green]Initializing...[/bold green]"):
+                output, returncode = self.run_command_rc(cmd_parts)
             
-            if "Backup repository URL set to:" in output:
-                self.console.print(Panel(
+            if returncode == 0:
+                # The cached list belongs to the previous repository
+                self._list_cache = None
+                result = Panel(
                     output,
-                    title="[bold green]✓ Initialization Successful[/bold green]",
+                    title=_markup("[bold green]✓ Initialization Successful[/bold green]"),
                     border_style="green",
                     box=box.ROUNDED
-                ))
+                )
             else:
-                self.console.print(Panel(
+                result = Panel(
                     output,
-                    title="[bold red]✗ Initialization Failed[/bold red]",
+                    title=_markup("[bold red]✗ Initialization Failed[/bold red]"),
                     border_style="red",
                     box=box.ROUNDED
-                ))
+                )
         
-        self.console.print("\n[dim]Press Enter to continue...[/dim]")
-        input()
+        self.wait_for_key(result)
     
     def compare_backup(self):
         """Compare with a backup"""
-        self.console.clear()
-        self.show_header()
+        # Start fetching the list first so it runs while the screen is drawn
+        list_future = self._pool.submit(self.get_backup_list)
+        
+        self.new_screen()
+        result = None
         
         # First list backups
-        with self.console.status("[bold green]Fetching backups...[/bold green]"):
-            list_output = self.run_command("python3 stash-away.py list")
+        with self.spinner("[bold green]Fetching backups...[/bold green]"):
+            list_output = list_future.result()
         
-        self.console.print(Panel(
-            list_output,
-            title="[bold]Available Backups[/bold]",
-            border_style="blue",
-            box=box.ROUNDED
-        ))
+        self.console.print(self.backup_list_panel(list_output))
         
         backup_name = self.safe_input("\nEnter backup name to compare: ")
         
         if backup_name:
-            import shlex
-            cmd = f"python3 stash-away.py diff {shlex.quote(backup_name)}"
-            with self.console.status("[bold green]Comparing...[/bold green]"):
-                output = self.run_command(cmd)
+            cmd_parts = ["diff", backup_name]
+            with self.spinner("[bold green]Comparing...[/bold green]"):
+                output = self.run_command(cmd_parts)
             
-            self.console.print(Panel(
+            result = Panel(
                 output,
-                title=f"[bold]Diff with {backup_name}[/bold]",
+                title=_markup(f"[bold]Diff with {escape(backup_name)}[/bold]"),
                 border_style="yellow",
                 box=box.ROUNDED
-            ))
+            )
         
-        self.console.print("\n[dim]Press Enter to continue...[/dim]")
-        input()
+        self.wait_for_key(result)
     
     def restore_backup(self):
         """Restore a backup"""
-        self.console.clear()
-        self.show_header()
+        # Start fetching the list and the working tree state first, side by
+        # side, so they run while the screen is drawn
+        list_future = self._pool.submit(self.get_backup_list)
+        dirty_future = self._pool.submit(self.has_uncommitted_changes)
+        
+        self.new_screen()
+        result = None
         
         # First list backups
-        with self.console.status("[bold green]Fetching backups...[/bold green]"):
-            list_output = self.run_command("python3 stash-away.py list")
+        with self.spinner("[bold green]Fetching backups...[/bold green]"):
+            list_output = list_future.result()
+            dirty = dirty_future.result()
         
-        self.console.print(Panel(
-            list_output,
-            title="[bold]Available Backups[/bold]",
-            border_style="blue",
-            box=box.ROUNDED
-        ))
+        self.console.print(self.backup_list_panel(list_output))
+        if dirty:
+            # Checking out the restored branch carries these over, or fails if they conflict
+            self.console.print("[yellow]You have uncommitted changes. Push a backup first if they should be kept apart from the restored branch.[/yellow]")
         
         backup_name = self.safe_input("\nEnter backup name to restore: ")
         
-        if backup_name and Confirm.ask(f"[yellow]Restore {backup_name}?[/yellow]"):
-            import shlex
-            cmd = f"python3 stash-away.py restore {shlex.quote(backup_name)} --yes"
-            with self.console.status("[bold green]Restoring backup (this may take a while)...[/bold green]", spinner="dots12"):
-                output = self.run_command(cmd)
+        if backup_name and self.confirm(_markup(f"[yellow]Restore {escape(backup_name)}?[/yellow]")):
+            cmd_parts = ["restore", backup_name, "--yes"]
+            progress = OutputTail()
+            with self.spinner("[bold green]Restoring backup (this may take a while)...[/bold green]", spinner="dots12", output=progress):
+                output, returncode = self.run_command_rc(cmd_parts, progress)
             
-            if "Successfully restored backup." in output:
-                self.console.print(Panel(
+            if returncode == 0:
+                result = Panel(
                     output,
-                    title="[bold green]✓ Restore Successful[/bold green]",
+                    title=_markup("[bold green]✓ Restore Successful[/bold green]"),
                     border_style="green",
                     box=box.ROUNDED
-                ))
+                )
             else:
-                self.console.print(Panel(
+                result = Panel(
                     output,
-                    title="[bold red]✗ Restore Failed[/bold red]",
+                    title=_markup("[bold red]✗ Restore Failed[/bold red]"),
                     border_style="red",
                     box=box.ROUNDED
-                ))
+                )
         
-        self.console.print("\n[dim]Press Enter to continue...[/dim]")
-        input()
+        self.wait_for_key(result)
+    
+    def wait_for_key(self, result=None):
+        """Print a result panel and the continue prompt in one pass, then wait for a key"""
+        footer = _markup("\n[dim]Press any key to continue...[/dim]")
+        self.console.print(Group(result, footer) if result is not None else footer)
+        self.read_any_key()
+    
+    def read_any_key(self):
+        """Wait for a single keypress, or for a line when stdin is not a terminal"""
+        if self._saved_termios is None:
+            try:
+                input()
+            except EOFError:
+                pass
+            return
+        # get_key consumes a whole escape sequence, so an arrow key
+        # leaves nothing behind for the menu to read
+        with self.cbreak_mode():
+            self.get_key()
     
     def show_help(self):
         """Show comprehensive help screen"""
-        self.console.clear()
-        self.show_header()
+        self.new_screen()
         
-        help_content = """[bold cyan]NAVIGATION:[/bold cyan]
+        # The help text never changes, so its markup is parsed only once
+        if self._help_panel is None:
+            help_content = """[bold cyan]NAVIGATION:[/bold cyan]
   ↑↓ [cyan]Arrow Keys[/cyan]    Navigate between menu options
   [cyan]Enter[/cyan]            Execute highlighted option
   [cyan]Number Keys (1-7)[/cyan] Direct selection for quick access
@@ -506,89 +814,89 @@ class StashAwayTUI:
 
 [dim]Press any key to return to main menu...[/dim]"""
         
-        help_panel = Panel(
-            help_content,
-            title="[bold]Stash-Away Help[/bold]",
-            title_align="left",
-            border_style="blue",
-            box=box.ROUNDED,
-            padding=(1, 2)
-        )
+            self._help_panel = Panel(
+                Text.from_markup(help_content),
+                title=_markup("[bold]Stash-Away Help[/bold]"),
+                title_align="left",
+                border_style="blue",
+                box=box.ROUNDED,
+                padding=(1, 2)
+            )
         
-        self.console.print(help_panel)
-        input()
+        self.console.print(self._help_panel)
+        self.read_any_key()
     
     def quit_app(self):
         """Quit the application"""
-        if Confirm.ask("[yellow]Are you sure you want to quit?[/yellow]"):
+        try:
+            confirmed = self.confirm(_markup("[yellow]Are you sure you want to quit?[/yellow]"))
+        except EOFError:
+            # Nothing is left to read an answer from, so quit
+            confirmed = True
+        if confirmed:
             self.console.print("\n[bold green]Goodbye![/bold green]")
-            self.running = False
+            self.stop()
+    
+    def stop(self):
+        """Leave the main loop and drop any queued background work"""
+        self.running = False
+        self._pool.shutdown(wait=False, cancel_futures=True)
     
     def run(self):
         """Main application loop with cursor navigation"""
         while self.running:
-            self.console.clear()
-            self.show_header()
-            self.show_menu()
-            
-            # Show navigation instructions
-            self.console.print("[dim]Use ↑↓ arrows to navigate, Enter to select, or press number keys[/dim]")
-            
             try:
-                key = self.get_key()
+                key = self.read_menu_key()
+                if key == 'EOF':
+                    # stdin is exhausted; every further read would hit EOF again
+                    self.stop()
+                    return
                 
-                if key == 'UP':
-                    self.selected_index = (self.selected_index - 1) % len(self.menu_items)
-                elif key == 'DOWN':
-                    self.selected_index = (self.selected_index + 1) % len(self.menu_items)
-                elif key == 'ENTER':
+                if key in self.menu_items:
+                    # A number key selects its entry and then runs it like Enter
+                    self.selected_index = self.menu_keys.index(key)
+                    key = 'ENTER'
+                
+                if key == 'ENTER':
                     # Execute selected menu item
-                    _, action = self.menu_items[self.selected_index]
-                    action()
-                elif key == 'QUIT' or key == 'CTRL_C':
+                    self._actions[self.selected_index]()
+                elif key == 'QUIT':
                     self.quit_app()
-                elif key in '12345678':
-                    # Direct number selection (legacy support)
-                    try:
-                        index = int(key) - 1
-                        if 0 <= index < len(self.menu_items):
-                            self.selected_index = index
-                            _, action = self.menu_items[index]
-                            action()
-                    except (ValueError, IndexError):
-                        self.console.print("[red]Invalid option. Please try again.[/red]")
-                        time.sleep(1)
                 elif key == 'Q':
                     self.quit_app()
                 elif key == 'H':
                     self.show_help()
-                else:
-                    # For any other key, just refresh the display
-                    continue
                     
             except KeyboardInterrupt:
                 self.quit_app()
+            except EOFError:
+                # A prompt inside an action ran out of input; retrying would spin
+                self.stop()
+                return
             except Exception as e:
-                self.console.print(f"[red]Error: {str(e)}[/red]")
-                time.sleep(1)
+                # Shown under the menu when it is drawn again; plain Text, since
+                # the error itself may contain something that reads as markup
+                self._message = Text(f"Error: {e}", style="red")
 
 def main():
-    # Check if we're in a git repository
-    if not os.path.exists('.git'):
-        console = Console()
+    # One console serves the app and every error message below
+    console = Console(file=sys.stdout)
+    # Check if we're in a git repository, reusing the CLI's memoized check when
+    # it loads; unlike looking for .git it also works in subdirectories
+    cli = load_cli()
+    in_repository = cli.is_git_repository() if cli else has_git_dir(os.getcwd())
+    if not in_repository:
         console.print("[bold red]Error:[/bold red] Not in a git repository")
         sys.exit(1)
     
     try:
-        app = StashAwayTUI()
+        app = StashAwayTUI(cli, auto_confirm=any(arg in ('--yes', '-y') for arg in sys.argv[1:]), console=console)
         app.run()
     except KeyboardInterrupt:
-        console = Console()
         console.print("\n[bold yellow]Interrupted by user[/bold yellow]")
         sys.exit(0)
     except Exception as e:
-        console = Console()
-        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        console.print(f"[bold red]Error:[/bold red] {escape(str(e))}")
         sys.exit(1)
 
 # Only run main if this file is executed directly, not when imported
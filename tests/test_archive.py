@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import unittest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'stash-away.py')
+
+# Commits need an identity, and file:// submodules must be allowed explicitly
+GIT_ENV = dict(
+    os.environ,
+    GIT_AUTHOR_NAME='test', GIT_AUTHOR_EMAIL='test@example.com',
+    GIT_COMMITTER_NAME='test', GIT_COMMITTER_EMAIL='test@example.com',
+    GIT_CONFIG_COUNT='1', GIT_CONFIG_KEY_0='protocol.file.allow', GIT_CONFIG_VALUE_0='always',
+)
+
+def git(cwd, *args):
+    subprocess.run(['git', *args], cwd=cwd, env=GIT_ENV, check=True, capture_output=True)
+
+def make_repo(path, files):
+    os.makedirs(path)
+    git(path, 'init', '-q')
+    for name, content in files.items():
+        os.makedirs(os.path.join(path, os.path.dirname(name)), exist_ok=True)
+        with open(os.path.join(path, name), 'w') as f:
+            f.write(content)
+    git(path, 'add', '.')
+    git(path, 'commit', '-qm', 'init')
+
+def archive_names(cwd):
+    """Run the archive command in cwd and return the member names of the archive it writes"""
+    subprocess.run([sys.executable, SCRIPT, 'archive'], cwd=cwd, env=GIT_ENV, check=True, capture_output=True)
+    archive, = [name for name in os.listdir(cwd) if name.startswith('stash-away-backup-')]
+    with tarfile.open(os.path.join(cwd, archive)) as tar:
+        return {name.removeprefix('./').rstrip('/') for name in tar.getnames()}
+
+class ArchiveFromSubdirectoryTest(unittest.TestCase):
+    """Archives cover the whole repository whichever directory they are made from"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = temp_dir.name
+        self.repo = os.path.join(self.root, 'repo')
+        make_repo(self.repo, {'top.txt': 'top\n', 'sub/s.txt': 's\n', 'sub/deep/d.txt': 'd\n'})
+
+    def assert_whole_repository(self, names):
+        self.assertTrue({'top.txt', 'sub/s.txt', 'sub/deep/d.txt'} <= names, names)
+
+    def test_plain_repository(self):
+        self.assert_whole_repository(archive_names(os.path.join(self.repo, 'sub')))
+
+    def test_repository_with_submodule(self):
+        make_repo(os.path.join(self.root, 'inner'), {'in_sub.txt': 'inner\n'})
+        git(self.repo, 'submodule', 'add', '-q', '../inner', 'subm')
+        git(self.repo, 'commit', '-qm', 'add submodule')
+        names = archive_names(os.path.join(self.repo, 'sub', 'deep'))
+        self.assert_whole_repository(names)
+        self.assertIn('subm/in_sub.txt', names)
+
+if __name__ == '__main__':
+    unittest.main()